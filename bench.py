@@ -0,0 +1,214 @@
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import solver
+from board import Board, build_board, mark_date
+from bricks import Blocks, Brick, Position, build_bricks, transform
+
+DATE = (10, 19, 1)
+SEED = 0
+N_CAPTURE = 2000
+N_STATES = 40
+REPEAT = 5
+
+BASELINE_PATH = "bench_baseline.json"
+THRESHOLD = 0.25
+
+Placement = tuple[Brick, Position, transform]
+
+
+class _CaptureDone(Exception):
+    pass
+
+
+# * Board states
+def capture_states(bricks: list[Brick]) -> list[list[Placement]]:
+    """Record the stack of placed bricks at each step of a real search."""
+    stack: list[Placement] = []
+    states: list[list[Placement]] = []
+    by_id = {b.id: b for b in bricks}
+
+    def _put(put: Callable) -> Callable:
+        def wrapper(board, id, blocks, pos0, *args):
+            put(board, id, blocks, pos0, *args)
+            stack.append((by_id[id], pos0, solver.transform_maps[id][blocks]))
+            states.append(list(stack))
+            if len(states) >= N_CAPTURE:
+                raise _CaptureDone
+
+        return wrapper
+
+    def _lift(lift: Callable) -> Callable:
+        def wrapper(board, id, blocks, pos0, *args):
+            lift(board, id, blocks, pos0, *args)
+            stack.pop()
+
+        return wrapper
+
+    # ? Memoized regions are put back with take/free instead of put/lift
+    patches = {
+        "put_brick_at": _put,
+        "take_brick_at": _put,
+        "lift_brick_at": _lift,
+        "free_brick_at": _lift,
+    }
+    originals = {name: getattr(solver, name) for name in patches}
+
+    random.seed(SEED)
+    for name, patch in patches.items():
+        setattr(solver, name, patch(originals[name]))
+    try:
+        solver.solve(mark_date(build_board(), *DATE), bricks, {}, verbose=False)
+    except _CaptureDone:
+        pass
+    finally:
+        for name, fn in originals.items():
+            setattr(solver, name, fn)
+
+    step = max(1, len(states) // N_STATES)
+    return states[::step][:N_STATES]
+
+
+def load_state(bricks: list[Brick], placements: list[Placement]) -> Board:
+    random.seed(SEED)
+    board = mark_date(build_board(), *DATE)
+    solver.init(board, {}, bricks, False)
+    solver.place_records(board, placements)
+    return board
+
+
+# * Primitive workloads
+def get_workloads(
+    board: Board, bricks: list[Brick], placements: list[Placement]
+) -> dict[str, tuple[Callable, list[tuple[Any, ...]]]]:
+    cells = [Position(i, j) for i, j, _ in board]
+    free = [pos for pos in cells if solver.valid_pos(board, pos)]
+    left = [b for b in bricks if all(b is not p[0] for p in placements)]
+    shapes = [blocks for b in left for blocks in solver.transform_maps[b.id]]
+    check_fn = solver.get_check_fn(left[1:])
+
+    def put_lift(id: int, blocks: Blocks, pos0: Position):
+        solver.put_brick_at(board, id, blocks, pos0, check_fn)
+        solver.lift_brick_at(board, id, blocks, pos0, check_fn)
+
+    fits = [
+        (b.id, blocks, pos)
+        for b in left[:1]
+        for blocks in solver.transform_maps[b.id]
+        for pos in free
+        if solver.try_brick_at(board, blocks, pos)
+    ]
+
+    return {
+        "valid_pos": (solver.valid_pos, [(board, pos) for pos in cells]),
+        "try_brick_at": (
+            solver.try_brick_at,
+            [(board, blocks, pos) for blocks in shapes for pos in free],
+        ),
+        "get_area": (solver.get_area_to_kill, [(board, pos) for pos in free]),
+        "put+lift_brick_at": (put_lift, fits),
+        "Position.__add__": (
+            Position.__add__,
+            [(pos, d) for pos in cells for d in solver.DIRS],
+        ),
+        "Blocks.__iter__": (list, [(blocks,) for blocks in shapes]),
+    }
+
+
+def time_ns(fn: Callable, args: list[tuple[Any, ...]]) -> int:
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter_ns()
+        for a in args:
+            fn(*a)
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best or 0
+
+
+def peak_bytes(fn: Callable, args: list[tuple[Any, ...]]) -> int:
+    """Sum of per-call peak traced memory, the closest CPython gets to an alloc count."""
+    total = 0
+    tracemalloc.start()
+    for a in args:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(*a)
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total
+
+
+def run() -> dict[str, dict[str, float]]:
+    bricks = build_bricks()
+    totals: dict[str, list[int]] = dict()
+
+    for placements in capture_states(bricks):
+        board = load_state(bricks, placements)
+        for name, (fn, args) in get_workloads(board, bricks, placements).items():
+            t = totals.setdefault(name, [0, 0, 0])
+            t[0] += time_ns(fn, args)
+            t[1] += peak_bytes(fn, args)
+            t[2] += len(args)
+
+    return {
+        name: {"ns_per_op": ns / n, "bytes_per_op": b / n}
+        for name, (ns, b, n) in totals.items()
+        if n
+    }
+
+
+# * Reporting
+def compare(results: dict[str, dict[str, float]], baseline: dict) -> list[str]:
+    """Describe every primitive that regressed or has nothing to compare with."""
+    problems: list[str] = []
+    for name, r in results.items():
+        if name not in baseline:
+            problems.append(f"{name} has no baseline")
+            continue
+        base = baseline[name]["ns_per_op"]
+        if r["ns_per_op"] > base * (1 + THRESHOLD):
+            problems.append(f"{name} regressed past {THRESHOLD:.0%} of {base:.1f} ns")
+    return problems
+
+
+def main():
+    save = "--save" in sys.argv[1:]
+
+    # ? Without a baseline nothing is checked, so that must not pass silently
+    if not save and not os.path.exists(BASELINE_PATH):
+        print(f"No baseline at {BASELINE_PATH}, create one with --save")
+        sys.exit(2)
+
+    results = run()
+    baseline = dict()
+    if not save:
+        with open(BASELINE_PATH, "r") as f:
+            baseline = json.load(f)
+
+    print(f"{'primitive':<20}{'ns/op':>12}{'B/op':>10}{'baseline':>12}")
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("ns_per_op")
+        base_s = f"{base:>12.1f}" if base else f"{'-':>12}"
+        print(f"{name:<20}{r['ns_per_op']:>12.1f}{r['bytes_per_op']:>10.1f}{base_s}")
+
+    if save:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return
+
+    problems = compare(results, baseline)
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ class CellType(Enum):
 VALUE_RANGES: dict[CellType, Iterable] = {
     CellType.MONTH: range(1, 13),
     CellType.DAY: range(1, 32),
-    CellType.WEEKDAY: range(1, 8),
+    CellType.WEEKDAY: range(0, 7),
     CellType.NONE: [-1],
 }
 
@@ -82,9 +82,12 @@ def cell2str(cell: Cell) -> str:
 
 
 class Board:
-    _board: list[list[Cell]] = []
+    _board: list[list[Cell]]
     _nil = Cell(-1, -1, CellType.NONE, -1, is_nil=True)
 
+    def __init__(self) -> None:
+        self._board = []
+
     def __len__(self) -> int:
         return len(self._board)
 
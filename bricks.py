@@ -130,6 +130,28 @@ def get_all_transforms(blocks: Blocks) -> dict[Blocks, transform]:
     return {get_transform(blocks, t): t for t in transform}
 
 
+def normalize(blocks: Blocks) -> tuple[vector2, ...]:
+    """The shape of `blocks` shifted so its minimum x and y are 0."""
+    x0 = min(pos[0] for pos in blocks)
+    y0 = min(pos[1] for pos in blocks)
+    return tuple(sorted((pos[0] - x0, pos[1] - y0) for pos in blocks))
+
+
+def unique_shapes(transforms: dict[Blocks, transform]) -> list[Blocks]:
+    """
+    Drop orientations that are translations of an earlier one; they cover the
+    same cells from another origin and would repeat every solution.
+    """
+    seen: set[tuple[vector2, ...]] = set()
+    shapes: list[Blocks] = []
+    for blocks in transforms:
+        shape = normalize(blocks)
+        if shape not in seen:
+            seen.add(shape)
+            shapes.append(blocks)
+    return shapes
+
+
 class Brick:
     blocks: Blocks
     id: int
@@ -138,12 +160,16 @@ class Brick:
         self.blocks = Blocks(_blocks)
 
 
-def build_bricks(json_path="bricks.json") -> list[Brick]:
-    with open(json_path, "r") as f:
-        _bricks = json.load(f)
-
+def bricks_from_arrays(_bricks: list[list[vector2]]) -> list[Brick]:
     bricks = list(map(lambda arr: Brick(arr), _bricks))
     for i, b in enumerate(bricks):
         b.id = i
 
     return bricks
+
+
+def build_bricks(json_path="bricks.json") -> list[Brick]:
+    with open(json_path, "r") as f:
+        _bricks = json.load(f)
+
+    return bricks_from_arrays(_bricks)
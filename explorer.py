@@ -0,0 +1,212 @@
+import argparse
+import datetime
+import json
+import multiprocessing as mp
+import random
+import statistics
+from dataclasses import dataclass, field
+from typing import Optional
+
+import solver
+from board import CellType, build_board, mark_date
+from bricks import Brick, bricks_from_arrays, vector2
+from solution_io import Date
+
+BrickArrays = list[list[vector2]]
+
+DIRS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+# ? Solutions counted per date; min/median counts saturate at the cap, and a
+# ? cap of 1 only checks solvability so every candidate ranks the same.
+# ? Good candidates still tie at 10.
+DEFAULT_CAP = 100
+
+
+@dataclass
+class Candidate:
+    name: str
+    arrays: BrickArrays
+
+
+@dataclass
+class CandidateResult:
+    name: str
+    counts: list[int] = field(default_factory=list)
+    failed: Optional[Date] = None
+    reason: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.failed is None and not self.reason
+
+    @property
+    def min_count(self) -> int:
+        return min(self.counts) if self.counts else 0
+
+    @property
+    def median_count(self) -> float:
+        return statistics.median(self.counts) if self.counts else 0
+
+
+def all_dates(year: int = 2024) -> list[Date]:
+    """Every (month, day, weekday) of `year`, weekday counted from Sunday = 0."""
+    dates: list[Date] = []
+    d = datetime.date(year, 1, 1)
+    while d.year == year:
+        dates.append((d.month, d.day, (d.weekday() + 1) % 7))
+        d += datetime.timedelta(days=1)
+    return dates
+
+
+# * Candidates
+def load_candidate(json_path: str) -> Candidate:
+    with open(json_path, "r") as f:
+        return Candidate(json_path, json.load(f))
+
+
+def _connected(cells: list[vector2]) -> bool:
+    left = set(cells)
+    stack = [cells[0]]
+    left.discard(cells[0])
+    while stack:
+        x, y = stack.pop()
+        for dx, dy in DIRS:
+            n = x + dx, y + dy
+            if n in left:
+                left.discard(n)
+                stack.append(n)
+    return not left
+
+
+def mutate(arrays: BrickArrays, rng: random.Random) -> Optional[BrickArrays]:
+    """Move one block of one brick to another cell next to that brick."""
+    i = rng.randrange(len(arrays))
+    cells: list[vector2] = [tuple(pos) for pos in arrays[i]]
+
+    # ? The origin block stays, the solver places bricks by it
+    drop = rng.choice([pos for pos in cells if pos != (0, 0)])
+    rest = [pos for pos in cells if pos != drop]
+    frontier = sorted(
+        {(x + dx, y + dy) for x, y in rest for dx, dy in DIRS} - set(cells)
+    )
+    new = rest + [rng.choice(frontier)]
+    if not _connected(new):
+        return None
+
+    mutated = [list(map(list, b)) for b in arrays]
+    mutated[i] = [list(pos) for pos in new]
+    return mutated
+
+
+def get_mutations(base: Candidate, n: int, seed: int = 0) -> list[Candidate]:
+    rng = random.Random(seed)
+    candidates: list[Candidate] = []
+    while len(candidates) < n:
+        arrays = mutate(base.arrays, rng)
+        if arrays is not None:
+            candidates.append(Candidate(f"{base.name}#{len(candidates)}", arrays))
+    return candidates
+
+
+# * Evaluation
+def count_solutions(
+    month: int, day: int, weekday: int, bricks: list[Brick], cap: int
+) -> int:
+    board = mark_date(build_board(), month, day, weekday)
+    return solver.count_covers(board, bricks, cap)
+
+
+def free_cells(date: Date) -> int:
+    board = mark_date(build_board(), *date)
+    return sum(
+        1 for _, _, cell in board if cell.type != CellType.NONE and not cell.goal
+    )
+
+
+def evaluate(args: tuple[Candidate, list[Date], int]) -> CandidateResult:
+    """Run one candidate over the dates, stopping at the first unsolvable one."""
+    candidate, dates, cap = args
+    result = CandidateResult(candidate.name)
+    bricks = bricks_from_arrays(candidate.arrays)
+
+    size = sum(len(b.blocks) for b in bricks)
+    if dates and size != free_cells(dates[0]):
+        result.reason = f"{size} blocks for {free_cells(dates[0])} cells"
+        return result
+
+    # ? Most mutations fail some date, finding it at cap 1 is cheaper
+    for i, date in enumerate(dates):
+        if count_solutions(*date, bricks, 1) == 0:
+            result.counts = [1] * i
+            result.failed = date
+            return result
+
+    result.counts = [count_solutions(*date, bricks, cap) for date in dates]
+    return result
+
+
+def rank(results: list[CandidateResult]) -> list[CandidateResult]:
+    return sorted(
+        results,
+        key=lambda r: (r.ok, len(r.counts), r.min_count, r.median_count),
+        reverse=True,
+    )
+
+
+def explore(
+    candidates: list[Candidate],
+    dates: Optional[list[Date]] = None,
+    cap: int = DEFAULT_CAP,
+    processes: Optional[int] = None,
+) -> list[CandidateResult]:
+    """
+    Evaluate every candidate brick set over `dates` on a process pool.
+    Distinct covers are counted up to `cap` per date.
+    """
+    if dates is None:
+        dates = all_dates()
+
+    # ? Warm the orientation tables so forked workers share them
+    for c in candidates:
+        for b in bricks_from_arrays(c.arrays):
+            solver.get_shapes(b.blocks)
+
+    with mp.Pool(processes) as pool:
+        results = list(
+            pool.imap_unordered(evaluate, [(c, dates, cap) for c in candidates])
+        )
+    return rank(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank candidate brick sets.")
+    parser.add_argument("paths", nargs="*", default=["bricks.json"])
+    parser.add_argument("--mutate", type=int, default=0, help="mutations per file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cap",
+        type=int,
+        default=DEFAULT_CAP,
+        help="solutions counted per date; 1 only checks solvability",
+    )
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    candidates: list[Candidate] = []
+    for path in args.paths:
+        base = load_candidate(path)
+        candidates.append(base)
+        candidates += get_mutations(base, args.mutate, args.seed)
+
+    results = explore(candidates, all_dates(args.year), args.cap, args.processes)
+    for r in results:
+        status = "ok" if r.ok else r.reason or f"fails on {r.failed}"
+        print(
+            f"{r.name:<24} {status:<24} solved {len(r.counts):>3}"
+            f"  min {r.min_count:>4}  median {r.median_count:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import json
+import os
+import time
+from typing import Callable, Optional
+
+import solver
+from board import Board, build_board, mark_date
+from bricks import (
+    Blocks,
+    Brick,
+    Position,
+    build_bricks,
+    get_transform,
+    transform,
+    unique_shapes,
+)
+from solution_io import NDJSON, Date, SolutionWriter
+from solver import Records
+
+# ? A frame is [brick index, orientation index, origin index].
+# ? Every frame below the top is a brick currently on the board; the top
+# ? frame is the next candidate to try.
+Frame = list[int]
+
+CHECKPOINT_INTERVAL = 60.0
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class Search:
+    """Exhaustive search over an explicit stack, so it can stop and resume."""
+
+    def __init__(self, board: Board, bricks: list[Brick]) -> None:
+        self.board = board
+        self.bricks = bricks
+        self.nodes = 0
+
+        solver.init(board, {}, bricks, False)
+        self.orientations: list[list[Blocks]] = [
+            unique_shapes(solver.transform_maps[b.id]) for b in bricks
+        ]
+        self.origins: list[Position] = sorted(
+            Position(i, j)
+            for i, j, _ in board
+            if solver.valid_pos(board, Position(i, j))
+        )
+        self.check_fns = [
+            solver.get_check_fn(bricks[d + 1 :]) for d in range(len(bricks))
+        ]
+        self.stack: list[Frame] = [[0, 0, 0]]
+        # ? Frames below the floor are fixed bricks, never backtracked
+        self.floor = 0
+
+    def _put(self, frame: Frame):
+        d, o, p = frame
+        blocks = self.orientations[d][o]
+        solver.put_brick_at(
+            self.board, self.bricks[d].id, blocks, self.origins[p], self.check_fns[d]
+        )
+
+    def _lift(self, frame: Frame):
+        d, o, p = frame
+        blocks = self.orientations[d][o]
+        solver.lift_brick_at(
+            self.board, self.bricks[d].id, blocks, self.origins[p], self.check_fns[d]
+        )
+
+    def restore(self, stack: list[Frame]):
+        """Replay the placed frames of a checkpointed stack onto the board."""
+        for frame in stack[:-1]:
+            self._put(frame)
+        self.stack = [list(frame) for frame in stack]
+
+    def frames_for(self, records: Records, depth: int) -> list[Frame]:
+        """
+        Stack with the first `depth` bricks placed as in `records`, ready to
+        search the rest.
+        """
+        stack: list[Frame] = []
+        for d, brick in enumerate(self.bricks[:depth]):
+            pos0, t = records[brick.id]
+            cells = sorted(pos0 + block for block in get_transform(brick.blocks, t))
+            frames = [
+                [d, o, p]
+                for o, blocks in enumerate(self.orientations[d])
+                for p, origin in enumerate(self.origins)
+                if sorted(origin + block for block in blocks) == cells
+            ]
+            if not frames:
+                raise CheckpointError(f"brick {brick.id} cannot be put at {pos0}")
+            stack.append(frames[0])
+        return stack + [[depth, 0, 0]]
+
+    def records(self) -> Records:
+        records: Records = [
+            (Position(-1, -1), transform.U) for _ in range(len(self.bricks))
+        ]
+        for d, o, p in self.stack[:-1]:
+            brick = self.bricks[d]
+            blocks = self.orientations[d][o]
+            records[brick.id] = self.origins[p], solver.transform_maps[brick.id][blocks]
+        return records
+
+    def _backtrack(self):
+        self.stack.pop()
+        if len(self.stack) > self.floor:
+            self._lift(self.stack[-1])
+            self.stack[-1][2] += 1
+
+    def step(self) -> Optional[Records]:
+        """Advance by one candidate. Return the records when a solution is reached."""
+        frame = self.stack[-1]
+        d, o, p = frame
+
+        if d == len(self.bricks):
+            records = self.records()
+            self._backtrack()
+            return records
+        if o == len(self.orientations[d]):
+            self._backtrack()
+            return None
+        if p == len(self.origins):
+            frame[1] += 1
+            frame[2] = 0
+            return None
+
+        if not solver.try_brick_at(
+            self.board, self.orientations[d][o], self.origins[p]
+        ):
+            frame[2] += 1
+            return None
+
+        self._put(frame)
+        if solver.dead_count > 0:
+            self._lift(frame)
+            frame[2] += 1
+            return None
+
+        self.nodes += 1
+        self.stack.append([d + 1, 0, 0])
+        return None
+
+    def done(self) -> bool:
+        return len(self.stack) <= self.floor
+
+
+# * Checkpoints
+def save_checkpoint(path: str, state: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str, date: Date) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        state = json.load(f)
+    if tuple(state["date"]) != date:
+        raise CheckpointError(f"{path} belongs to {state['date']}, not {list(date)}")
+    return state
+
+
+def enumerate_solutions(
+    month: int,
+    day: int,
+    weekday: int,
+    out_path: str,
+    checkpoint_path: str,
+    json_path: str = "bricks.json",
+    fmt: str = NDJSON,
+    interval: float = CHECKPOINT_INTERVAL,
+    on_solution: Optional[Callable[[Records], None]] = None,
+    placed: Optional[dict[int, tuple[Position, transform]]] = None,
+    max_steps: Optional[int] = None,
+) -> int:
+    """
+    Write every solution for the date to `out_path`, checkpointing the search
+    stack to `checkpoint_path` every `interval` seconds. If the checkpoint
+    exists the run resumes from it. Return the total number of solutions.
+    `placed` fixes some bricks as in `solver.complete`. With `max_steps` the
+    run checkpoints and returns after that many steps; call again until the
+    checkpoint says it is done.
+    """
+    date = (month, day, weekday)
+    placed = placed or {}
+    bricks = build_bricks(json_path)
+    bricks = [b for b in bricks if b.id in placed] + [
+        b for b in bricks if b.id not in placed
+    ]
+    search = Search(mark_date(build_board(), month, day, weekday), bricks)
+    search.floor = len(placed)
+
+    state = load_checkpoint(checkpoint_path, date)
+    if state is None:
+        writer = SolutionWriter(out_path, len(bricks), fmt)
+        solutions = 0
+        if placed:
+            records: Records = [
+                placed.get(id, (Position(-1, -1), transform.U))
+                for id in range(len(bricks))
+            ]
+            search.restore(search.frames_for(records, len(placed)))
+    else:
+        if state.get("floor", 0) != search.floor:
+            raise CheckpointError(f"{checkpoint_path} fixes another set of bricks")
+        writer = SolutionWriter(out_path, len(bricks), fmt, resume_at=state["offset"])
+        search.restore(state["stack"])
+        search.nodes = state["nodes"]
+        solutions = state["solutions"]
+
+    def checkpoint():
+        save_checkpoint(
+            checkpoint_path,
+            {
+                "date": list(date),
+                "floor": search.floor,
+                "stack": search.stack,
+                "nodes": search.nodes,
+                "solutions": solutions,
+                "done": search.done(),
+                "offset": writer.flush(),
+            },
+        )
+
+    with writer:
+        last = time.perf_counter()
+        steps = 0
+        while not search.done() and (max_steps is None or steps < max_steps):
+            steps += 1
+            records = search.step()
+            if records is not None:
+                writer.write(date, records)
+                solutions += 1
+                if on_solution:
+                    on_solution(records)
+            if time.perf_counter() - last >= interval:
+                checkpoint()
+                last = time.perf_counter()
+        checkpoint()
+
+    return solutions
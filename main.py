@@ -1,8 +1,10 @@
+import argparse
 import datetime
-import sys
+import os
 from typing import Optional
 from board import build_board, mark_date
 from bricks import Brick, build_bricks, get_transform
+from solution_io import BINARY, NDJSON, SolutionWriter
 from solver import Records, solve
 from output_utils import PALLATES, RESET_COLOR
 
@@ -22,17 +24,22 @@ def display_records(
 
 
 def main():
-    month: int
-    day: int
-    weekday: int
-
-    if len(sys.argv) == 1:
-        today = datetime.date.today()
-        month = today.month
-        day = today.day
-        weekday = (today.weekday() + 1) % 7
-    else:
-        raise NotImplementedError
+    parser = argparse.ArgumentParser(description="Solve today's puzzle.")
+    parser.add_argument(
+        "--out", help="append the solution to this file instead of printing it"
+    )
+    parser.add_argument("--format", choices=[NDJSON, BINARY], default=NDJSON)
+    parser.add_argument(
+        "--stats",
+        default="placement_stats.json",
+        help="placement statistics learned across daily runs",
+    )
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    month = today.month
+    day = today.day
+    weekday = (today.weekday() + 1) % 7
 
     board = build_board()
     board = mark_date(board, month, day, weekday)
@@ -47,9 +54,17 @@ def main():
     }
     colormap[-1] = RESET_COLOR
 
-    board, records = solve(board, bricks, colormap)
+    board, records = solve(board, bricks, colormap, stats_path=args.stats)
     board.display(colormap)
-    print(records)
+    if not records:
+        print("No solution found")
+    elif args.out:
+        # ? Daily runs append to the same file
+        size = os.path.getsize(args.out) if os.path.exists(args.out) else 0
+        with SolutionWriter(args.out, len(bricks), args.format, size or None) as writer:
+            writer.write((month, day, weekday), records)
+    else:
+        print(records)
     # display_records(bricks, records, colormap)
 
 
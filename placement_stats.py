@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+from collections import Counter
+
+from bricks import Brick, Position, transform
+
+# ? (brick id, transform value, x, y)
+Key = tuple[int, int, int, int]
+
+
+def _key(id: int, t: transform, pos: Position) -> Key:
+    return id, t.value, pos[0], pos[1]
+
+
+def fingerprint(bricks: list[Brick]) -> str:
+    """Hash of every brick's blocks by id, as stats only apply to the same set."""
+    shapes = [
+        [[pos[0], pos[1]] for pos in b.blocks]
+        for b in sorted(bricks, key=lambda b: b.id)
+    ]
+    return hashlib.sha1(json.dumps(shapes).encode()).hexdigest()
+
+
+class PlacementStats:
+    """
+    How often each placement was put down (visits), how often it was pruned
+    right after (prunes) and how often it appeared in a solution (hits),
+    gathered over past solves of the brick set with `fingerprint`.
+    """
+
+    def __init__(self, fingerprint: str = "") -> None:
+        self.fingerprint = fingerprint
+        self.solves = 0
+        self.hits: Counter[Key] = Counter()
+        self.prunes: Counter[Key] = Counter()
+        self.visits: Counter[Key] = Counter()
+
+    def __bool__(self) -> bool:
+        return bool(self.hits or self.visits)
+
+    def score(self, id: int, t: transform, pos: Position) -> float:
+        """
+        Smoothed rate of surviving a put, plus the share of solves it was in.
+        Unseen placements score 0.5, so one prune among many visits still
+        ranks above them.
+        """
+        key = _key(id, t, pos)
+        visits = self.visits[key]
+        survived = (visits - self.prunes[key] + 1) / (visits + 2)
+        return survived + self.hits[key] / (self.solves + 1)
+
+    def record_put(self, id: int, t: transform, pos: Position, pruned: bool):
+        key = _key(id, t, pos)
+        self.visits[key] += 1
+        if pruned:
+            self.prunes[key] += 1
+
+    def record_solution(self, records: list[tuple[Position, transform]]):
+        self.solves += 1
+        for id, (pos, t) in enumerate(records):
+            self.hits[_key(id, t, pos)] += 1
+
+
+COUNTERS = ("hits", "prunes", "visits")
+
+
+def load_stats(path: str, fingerprint: str) -> PlacementStats:
+    """Stats saved at `path`, or empty ones if missing or for other bricks."""
+    stats = PlacementStats(fingerprint)
+    if not os.path.exists(path):
+        return stats
+    with open(path, "r") as f:
+        obj = json.load(f)
+    if obj.get("fingerprint") != fingerprint:
+        return stats
+
+    stats.solves = obj["solves"]
+    for name in COUNTERS:
+        counter: Counter[Key] = getattr(stats, name)
+        for key, n in obj[name]:
+            counter[tuple(key)] = n
+    return stats
+
+
+def save_stats(stats: PlacementStats, path: str):
+    obj: dict = {"fingerprint": stats.fingerprint, "solves": stats.solves}
+    for name in COUNTERS:
+        obj[name] = [[list(k), n] for k, n in getattr(stats, name).items()]
+    # ? Write aside and swap, a killed batch must not leave truncated JSON
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
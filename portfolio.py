@@ -0,0 +1,144 @@
+import json
+import multiprocessing as mp
+import queue
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from board import build_board, mark_date
+from bricks import Brick, build_bricks
+from solver import Records, solve
+
+# * Brick orderings tried by the portfolio
+HEURISTICS: dict[str, Callable[[list[Brick], random.Random], list[Brick]]] = {
+    "given": lambda bricks, rng: list(bricks),
+    "largest": lambda bricks, rng: sorted(bricks, key=lambda b: -len(b.blocks)),
+    "reversed": lambda bricks, rng: list(reversed(bricks)),
+    "shuffled": lambda bricks, rng: rng.sample(bricks, len(bricks)),
+}
+
+# ? Seconds between checks for workers that died without reporting
+POLL_INTERVAL = 0.5
+
+
+@dataclass
+class PortfolioResult:
+    seed: int
+    heuristic: str
+    records: Records
+    elapsed: float
+
+
+def _worker(
+    month: int,
+    day: int,
+    weekday: int,
+    seed: int,
+    heuristic: str,
+    json_path: str,
+    results: "mp.Queue",
+):
+    random.seed(seed)
+    start = time.perf_counter()
+
+    # ? Always report back, a silent worker would leave the parent waiting
+    records: Records = []
+    try:
+        board = mark_date(build_board(), month, day, weekday)
+        bricks = HEURISTICS[heuristic](build_bricks(json_path), random.Random(seed))
+        _, records = solve(board, bricks, {}, verbose=False)
+    except Exception as e:
+        print(f"Portfolio worker {seed}/{heuristic} failed: {e!r}")
+    finally:
+        results.put((seed, heuristic, records, time.perf_counter() - start))
+
+
+def get_configs(n: int, base_seed: int) -> list[tuple[int, str]]:
+    """Spread `n` instances over the heuristics, each with its own seed."""
+    names = list(HEURISTICS)
+    return [(base_seed + i, names[i % len(names)]) for i in range(n)]
+
+
+def solve_portfolio(
+    month: int,
+    day: int,
+    weekday: int,
+    n: int = 4,
+    json_path: str = "bricks.json",
+    base_seed: Optional[int] = None,
+    timeout: Optional[float] = None,
+    log_path: Optional[str] = None,
+) -> Optional[PortfolioResult]:
+    """
+    Race `n` differently seeded and ordered solvers on separate processes.
+    The first solution wins and the remaining processes are terminated.
+    Return None if every instance fails, dies or `timeout` expires.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(1 << 30)
+
+    results: "mp.Queue" = mp.Queue()
+    procs = [
+        mp.Process(
+            target=_worker,
+            args=(month, day, weekday, seed, heuristic, json_path, results),
+            daemon=True,
+        )
+        for seed, heuristic in get_configs(n, base_seed)
+    ]
+    for p in procs:
+        p.start()
+
+    winner: Optional[PortfolioResult] = None
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    reported = 0
+    try:
+        while reported < len(procs):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            # ? Check exits before polling, so a last report still gets read
+            exited = all(p.exitcode is not None for p in procs)
+            try:
+                seed, heuristic, records, elapsed = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                # ? Killed workers (OOM, signals) never report
+                if exited:
+                    break
+                continue
+            reported += 1
+            if records:
+                winner = PortfolioResult(seed, heuristic, records, elapsed)
+                break
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
+    if winner and log_path:
+        log_win(log_path, (month, day, weekday), winner)
+    return winner
+
+
+# * Win statistics
+def log_win(log_path: str, date: tuple[int, int, int], result: PortfolioResult):
+    with open(log_path, "a") as f:
+        obj = {
+            "date": list(date),
+            "seed": result.seed,
+            "heuristic": result.heuristic,
+            "elapsed": result.elapsed,
+        }
+        f.write(json.dumps(obj) + "\n")
+
+
+def load_wins(log_path: str) -> Counter[str]:
+    """Count wins per heuristic in a log written by `solve_portfolio`."""
+    wins: Counter[str] = Counter()
+    with open(log_path, "r") as f:
+        for line in f:
+            if line.strip():
+                wins[json.loads(line)["heuristic"]] += 1
+    return wins
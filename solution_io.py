@@ -0,0 +1,283 @@
+import json
+import mmap
+import os
+import struct
+from typing import Generator, Optional
+
+from bricks import Position, transform
+from solver import Records
+
+Date = tuple[int, int, int]
+
+NDJSON = "ndjson"
+BINARY = "bin"
+
+# * Binary layout
+# ? File header: magic + number of bricks per record
+# ? Record: month, day, weekday, then (brick id, transform, x, y) per brick
+MAGIC = b"DPS1"
+HEADER = struct.Struct("<4sB")
+DATE = struct.Struct("<BBB")
+PLACEMENT = struct.Struct("<BBbb")
+
+BUFFER_SIZE = 1 << 16
+
+
+class SolutionFormatError(Exception):
+    pass
+
+
+def record_size(n_bricks: int) -> int:
+    return DATE.size + PLACEMENT.size * n_bricks
+
+
+def encode_json(date: Date, records: Records) -> bytes:
+    obj = {
+        "date": list(date),
+        "records": [[i, t.value, pos[0], pos[1]] for i, (pos, t) in enumerate(records)],
+    }
+    return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+
+
+def _put_placement(records: Records, i: int, t: int, x: int, y: int):
+    if not 0 <= i < len(records):
+        raise SolutionFormatError(f"brick id {i} out of range")
+    try:
+        records[i] = Position(x, y), transform(t)
+    except ValueError:
+        raise SolutionFormatError(f"{t} is not a valid transform")
+
+
+def _date(value) -> Date:
+    if len(value) != 3 or not all(isinstance(v, int) for v in value):
+        raise SolutionFormatError(f"invalid date {value}")
+    return tuple(value)
+
+
+def decode_json(line: bytes) -> tuple[Date, Records]:
+    try:
+        obj = json.loads(line)
+        date = _date(obj["date"])
+        records: Records = [(Position(-1, -1), transform.U) for _ in obj["records"]]
+        for i, t, x, y in obj["records"]:
+            _put_placement(records, i, t, x, y)
+    except (ValueError, KeyError, TypeError) as e:
+        raise SolutionFormatError(f"malformed line: {e}") from e
+    return date, records
+
+
+def encode_binary(date: Date, records: Records) -> bytes:
+    buf = bytearray(DATE.pack(*date))
+    for i, (pos, t) in enumerate(records):
+        buf += PLACEMENT.pack(i, t.value, pos[0], pos[1])
+    return bytes(buf)
+
+
+def decode_binary(buf, offset: int, n_bricks: int) -> tuple[Date, Records]:
+    if offset + record_size(n_bricks) > len(buf):
+        raise SolutionFormatError("truncated binary record")
+    date = DATE.unpack_from(buf, offset)
+    offset += DATE.size
+    records: Records = [(Position(-1, -1), transform.U) for _ in range(n_bricks)]
+    for _ in range(n_bricks):
+        _put_placement(records, *PLACEMENT.unpack_from(buf, offset))
+        offset += PLACEMENT.size
+    return date, records
+
+
+def read_header(buf: bytes) -> int:
+    """Return the brick count of a binary file header."""
+    if len(buf) < HEADER.size or buf[: len(MAGIC)] != MAGIC:
+        raise SolutionFormatError("missing binary header")
+    return HEADER.unpack_from(buf, 0)[1]
+
+
+class SolutionWriter:
+    """
+    Append solutions to `path` one at a time, either as NDJSON lines or as
+    fixed-width binary records. Nothing is kept in memory past the write buffer.
+    With `resume_at`, an existing file is truncated to that offset (as returned
+    by `flush`) and appended to instead.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        n_bricks: int,
+        fmt: str = NDJSON,
+        resume_at: Optional[int] = None,
+    ) -> None:
+        if fmt not in (NDJSON, BINARY):
+            raise SolutionFormatError(fmt)
+        self.fmt = fmt
+        self.n_bricks = n_bricks
+        self.count = 0
+        if resume_at is None:
+            self._f = open(path, "wb", buffering=BUFFER_SIZE)
+            if fmt == BINARY:
+                self._f.write(HEADER.pack(MAGIC, n_bricks))
+        else:
+            self._f = open(path, "r+b", buffering=BUFFER_SIZE)
+            try:
+                self._check_resume(resume_at)
+            except SolutionFormatError:
+                self._f.close()
+                raise
+            self._f.truncate(resume_at)
+            self._f.seek(resume_at)
+
+    def _check_resume(self, resume_at: int):
+        """Refuse to append to a file of another format or brick count."""
+        size = self._f.seek(0, 2)
+        if not 0 <= resume_at <= size:
+            raise SolutionFormatError(f"resume offset {resume_at} outside the file")
+        self._f.seek(0)
+        head = self._f.read(HEADER.size)
+        if self.fmt == BINARY:
+            n_bricks = read_header(head)
+            if n_bricks != self.n_bricks:
+                raise SolutionFormatError(
+                    f"file has {n_bricks} bricks per record, not {self.n_bricks}"
+                )
+            if resume_at < HEADER.size:
+                raise SolutionFormatError("resume offset inside the header")
+        elif head.startswith(MAGIC):
+            raise SolutionFormatError("cannot resume a binary file as NDJSON")
+        elif head and not head.startswith(b"{"):
+            raise SolutionFormatError("not an NDJSON solution file")
+
+    def write(self, date: Date, records: Records):
+        if len(records) != self.n_bricks:
+            raise SolutionFormatError(
+                f"expected {self.n_bricks} bricks, got {len(records)}"
+            )
+        if self.fmt == NDJSON:
+            self._f.write(encode_json(date, records))
+        else:
+            self._f.write(encode_binary(date, records))
+        self.count += 1
+
+    def flush(self) -> int:
+        """Flush to disk and return the offset a later run can resume at."""
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return self._f.tell()
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self) -> "SolutionWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class SolutionReader:
+    """
+    Memory-mapped reader for files produced by `SolutionWriter`.
+    Only an offset index is built up front; records are decoded on access.
+    A corrupt entry still gets an index slot and raises `SolutionFormatError`
+    when it is read, so callers can skip or report it.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._f = open(path, "rb")
+        self._mm: Optional[mmap.mmap] = None
+        self.fmt = NDJSON
+        self.n_bricks = 0
+        self._offsets: list[int] = []
+        self._dates: list[Optional[Date]] = []
+        self._index: dict[Date, list[int]] = dict()
+
+        # ? mmap refuses empty files
+        if self._f.seek(0, 2) == 0:
+            return
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[: len(MAGIC)] == MAGIC:
+            self.fmt = BINARY
+            self.n_bricks = read_header(self._mm[: HEADER.size])
+            self._build_binary_index()
+        else:
+            self._build_json_index()
+
+    def _add(self, date: Optional[Date], offset: int):
+        if date is not None:
+            self._index.setdefault(date, []).append(offset)
+        self._offsets.append(offset)
+        self._dates.append(date)
+
+    def _build_binary_index(self):
+        assert self._mm is not None
+        size = record_size(self.n_bricks)
+        for offset in range(HEADER.size, len(self._mm), size):
+            # ? A truncated tail keeps its slot and fails on decode
+            date = None
+            if offset + DATE.size <= len(self._mm):
+                date = DATE.unpack_from(self._mm, offset)
+            self._add(date, offset)
+
+    def _build_json_index(self):
+        assert self._mm is not None
+        offset = 0
+        while offset < len(self._mm):
+            end = self._mm.find(b"\n", offset)
+            if end == -1:
+                end = len(self._mm)
+            if end > offset:
+                self._add(self._json_date(offset, end), offset)
+            offset = end + 1
+
+    def _json_date(self, offset: int, end: int) -> Optional[Date]:
+        assert self._mm is not None
+        # ? `SolutionWriter` puts the date first, so the prefix is enough
+        head = self._mm[offset : min(end, offset + 32)]
+        if head.startswith(b'{"date":['):
+            try:
+                return _date(json.loads(head[head.index(b"[") : head.index(b"]") + 1]))
+            except (ValueError, TypeError, SolutionFormatError):
+                pass
+        # ? Other writers may order or space the keys differently
+        try:
+            return _date(json.loads(self._mm[offset:end])["date"])
+        except (ValueError, KeyError, TypeError, SolutionFormatError):
+            return None
+
+    def _decode(self, offset: int) -> tuple[Date, Records]:
+        assert self._mm is not None
+        if self.fmt == BINARY:
+            return decode_binary(self._mm, offset, self.n_bricks)
+        end = self._mm.find(b"\n", offset)
+        return decode_json(self._mm[offset : end if end != -1 else len(self._mm)])
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, i: int) -> tuple[Date, Records]:
+        return self._decode(self._offsets[i])
+
+    def __iter__(self) -> Generator[tuple[Date, Records], None, None]:
+        for offset in self._offsets:
+            yield self._decode(offset)
+
+    def date_at(self, i: int) -> Optional[Date]:
+        """Date of entry `i` from the index, None if it could not be read."""
+        return self._dates[i]
+
+    def dates(self) -> list[Date]:
+        return list(self._index)
+
+    def get(self, date: Date) -> list[Records]:
+        return [self._decode(offset)[1] for offset in self._index.get(date, [])]
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._f.close()
+
+    def __enter__(self) -> "SolutionReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
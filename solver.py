@@ -1,13 +1,29 @@
 import queue
+import time
+from collections import Counter
+from itertools import combinations
+from math import factorial, prod
 from random import randint
-from typing import Callable
+from typing import Callable, Iterable, Optional
 
 from board import Board, CellType
-from bricks import Blocks, Brick, Position, get_all_transforms, transform
+from bricks import (
+    Blocks,
+    Brick,
+    Position,
+    get_all_transforms,
+    get_transform,
+    normalize,
+    transform,
+    unique_shapes,
+)
+from placement_stats import PlacementStats, fingerprint, load_stats, save_stats
 from solver_display import display_status, running_bar
 
 PositionSet = set[tuple[float, Position]]
 Records = list[tuple[Position, transform]]
+Region = frozenset[Position]
+RegionKey = tuple[Region, tuple[int, ...]]
 
 # * Global Variables
 dead_count: int
@@ -15,7 +31,28 @@ blocks_suffix_sum: list[int]
 pos_set: PositionSet
 weight_map: dict[Position, float] = dict()
 colormap: dict[int, str]
+verbose: bool
+stats: Optional[PlacementStats]
 transform_maps: list[dict[Blocks, transform]]
+region_memo: dict[RegionKey, Optional[list[tuple[Brick, Position, transform]]]]
+deadline: Optional[float]
+count_memo: dict[RegionKey, int]
+
+# ? Orientation tables survive across solves, keyed by brick shape
+transform_cache: dict[Blocks, dict[Blocks, transform]] = dict()
+shape_cache: dict[Blocks, list[Blocks]] = dict()
+
+
+# ? Seconds `complete` may search before giving up, hints must feel instant
+HINT_BUDGET = 0.05
+
+
+class InvalidPlacementError(Exception):
+    pass
+
+
+class _OutOfTime(Exception):
+    pass
 
 
 def _weight(board: Board, pos: Position) -> float:
@@ -200,6 +237,19 @@ def lift_brick_at(
                 rescue_area(board, area)
 
 
+def get_regions(board: Board, cells: Iterable[Position]) -> list[Region]:
+    """Split the free cells among `cells` into connected regions."""
+    seen: set[Position] = set()
+    regions: list[Region] = []
+    for pos0 in cells:
+        if pos0 in seen or not valid_pos(board, pos0):
+            continue
+        area = frozenset(get_area_to_kill(board, pos0))
+        seen |= area
+        regions.append(area)
+    return regions
+
+
 def get_check_fn(bricks: list[Brick]) -> Callable[[Board, list[Position]], bool]:
     def check_fn(board: Board, area: list[Position]) -> bool:
         if not bricks:
@@ -219,8 +269,20 @@ def get_check_fn(bricks: list[Brick]) -> Callable[[Board, list[Position]], bool]
     return check_fn
 
 
+def get_transforms(blocks: Blocks) -> dict[Blocks, transform]:
+    if blocks not in transform_cache:
+        transform_cache[blocks] = get_all_transforms(blocks)
+    return transform_cache[blocks]
+
+
 # * Solving Functions
-def init(board: Board, _colormap: dict[int, str], bricks: list[Brick]):
+def init(
+    board: Board,
+    _colormap: dict[int, str],
+    bricks: list[Brick],
+    _verbose: bool,
+    _stats: Optional[PlacementStats] = None,
+):
     global dead_count
     dead_count = 0
 
@@ -245,74 +307,402 @@ def init(board: Board, _colormap: dict[int, str], bricks: list[Brick]):
     global colormap
     colormap = _colormap
 
+    global verbose
+    verbose = _verbose
+
+    global stats
+    stats = _stats
+
     global blocks_suffix_sum
     blocks_suffix_sum = [len(b.blocks) for b in bricks]
     for i in range(len(blocks_suffix_sum) - 1, 0, -1):
         blocks_suffix_sum[i - 1] += blocks_suffix_sum[i]
 
     global transform_maps
-    transform_maps = [get_all_transforms(b.blocks) for b in bricks]
+    transform_maps = [
+        get_transforms(b.blocks) for b in sorted(bricks, key=lambda b: b.id)
+    ]
+
+    global region_memo
+    region_memo = dict()
+
+    global deadline
+    deadline = None
+
+    global count_memo
+    count_memo = dict()
 
 
 count = 0
 
 
+def take_brick_at(board: Board, id: int, blocks: Blocks, pos0: Position):
+    """`put_brick_at` without pruning, for placements known to fit."""
+    for block in blocks:
+        remove_pos(board, id, pos0 + block)
+
+
+def free_brick_at(board: Board, id: int, blocks: Blocks, pos0: Position):
+    for block in blocks:
+        add_pos(board, id, pos0 + block)
+
+
+def place_records(board: Board, placements: list[tuple[Brick, Position, transform]]):
+    for brick, pos0, t in placements:
+        take_brick_at(board, brick.id, get_transform(brick.blocks, t), pos0)
+
+
+def lift_records(board: Board, placements: list[tuple[Brick, Position, transform]]):
+    for brick, pos0, t in reversed(placements):
+        free_brick_at(board, brick.id, get_transform(brick.blocks, t), pos0)
+
+
+def solve_region(
+    board: Board,
+    bricks: list[Brick],
+    region: Region,
+    records: Records,
+) -> bool:
+    """
+    Fill `region` with exactly `bricks`, memoized per (region, brick subset).
+    On success the bricks are left on the board.
+    """
+    key = region, tuple(b.id for b in bricks)
+    if key in region_memo:
+        placements = region_memo[key]
+        if placements is None:
+            return False
+        place_records(board, placements)
+        for brick, pos0, t in placements:
+            records[brick.id] = pos0, t
+        return True
+
+    if solve_recur(board, bricks, records, region):
+        region_memo[key] = [(b, *records[b.id]) for b in bricks]
+        return True
+    region_memo[key] = None
+    return False
+
+
+def region_subsets(
+    bricks: list[Brick], region: Region, last: bool
+) -> Iterable[tuple[Brick, ...]]:
+    """Subsets of `bricks` whose area matches `region`; all of them if `last`."""
+    sizes = [len(bricks)] if last else range(1, len(bricks) + 1)
+    for r in sizes:
+        for subset in combinations(bricks, r):
+            if sum(len(b.blocks) for b in subset) == len(region):
+                yield subset
+
+
+def solve_regions(
+    board: Board,
+    bricks: list[Brick],
+    regions: list[Region],
+    records: Records,
+) -> bool:
+    """
+    Assign the remaining bricks to independent regions with backtracking,
+    solving each region on its own.
+    """
+    if not regions:
+        return not bricks
+
+    region, rest = regions[0], regions[1:]
+    for subset in region_subsets(bricks, region, not rest):
+        if not solve_region(board, list(subset), region, records):
+            continue
+
+        others = [b for b in bricks if b not in subset]
+        if solve_regions(board, others, rest, records):
+            return True
+        lift_records(board, [(b, *records[b.id]) for b in subset])
+    return False
+
+
+def get_candidates(brick: Brick, region: Region) -> Iterable[tuple[Blocks, Position]]:
+    transforms = transform_maps[brick.id]
+    candidates = (
+        (blocks, pos0) for blocks in transforms for _, pos0 in pos_set if pos0 in region
+    )
+    if not stats:
+        return candidates
+
+    # ? Placements that solved past dates first, ones that got pruned last
+    return sorted(
+        candidates,
+        key=lambda c: -stats.score(brick.id, transforms[c[0]], c[1]),
+    )
+
+
 def solve_recur(
     board: Board,
     bricks: list[Brick],
-    cur: int,
     records: Records,
+    region: Region,
 ) -> bool:
     # ? Branch Cutting
-    if cur == len(bricks):
+    if not bricks:
         return True
     if dead_count > 0:
         return False
 
-    brick = bricks[cur]
-    transforms = transform_maps[cur]
-    left_count = len(bricks) - cur
+    # ? Independent regions are solved separately
+    regions = get_regions(board, region)
+    if len(regions) != 1:
+        return solve_regions(board, bricks, sorted(regions, key=len), records)
+
+    brick = bricks[0]
+    transforms = transform_maps[brick.id]
+    left_count = len(bricks)
 
     global count
-    if count % 1000 == 1:
+    if verbose and count % 1000 == 1:
         print(f"Round {count}")
     # running_bar(left_count)
     count += 1
 
-    for blocks in transforms:
-        for _, pos0 in pos_set:
+    for blocks, pos0 in get_candidates(brick, region):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _OutOfTime
+        if verbose:
             display_status(board, pos0, blocks, left_count, colormap)
-            # print(dead_count)
+        # print(dead_count)
 
-            if not try_brick_at(board, blocks, pos0):
-                continue
+        if not try_brick_at(board, blocks, pos0):
+            continue
 
-            check_fn = get_check_fn(bricks[cur + 1 :])
+        check_fn = get_check_fn(bricks[1:])
 
-            put_brick_at(board, brick.id, blocks, pos0, check_fn)
-            if solve_recur(board, bricks, cur + 1, records):
-                records[cur] = pos0, transforms[blocks]
-                return True
-            lift_brick_at(board, brick.id, blocks, pos0, check_fn)
+        put_brick_at(board, brick.id, blocks, pos0, check_fn)
+        if stats is not None:
+            stats.record_put(brick.id, transforms[blocks], pos0, dead_count > 0)
+        if solve_recur(board, bricks[1:], records, region):
+            records[brick.id] = pos0, transforms[blocks]
+            return True
+        lift_brick_at(board, brick.id, blocks, pos0, check_fn)
     return False
 
 
+def split_region(cells: Region) -> list[Region]:
+    """Connected parts of `cells`, without looking at the board."""
+    left = set(cells)
+    parts: list[Region] = []
+    while left:
+        stack = [left.pop()]
+        part = set(stack)
+        while stack:
+            for n in get_neighbors(stack.pop()):
+                if n in left:
+                    left.remove(n)
+                    part.add(n)
+                    stack.append(n)
+        parts.append(frozenset(part))
+    return parts
+
+
+def get_shapes(blocks: Blocks) -> list[Blocks]:
+    if blocks not in shape_cache:
+        shape_cache[blocks] = unique_shapes(get_transforms(blocks))
+    return shape_cache[blocks]
+
+
+def count_region(bricks: list[Brick], region: Region, cap: int) -> int:
+    """
+    Count covers of one connected `region` by exactly `bricks`, up to `cap`.
+    Unlike `solve_recur` this branches on the first free cell: every cover
+    puts exactly one brick there, so each cover is found once.
+    """
+    key = region, tuple(b.id for b in bricks)
+    if key in count_memo:
+        return count_memo[key]
+
+    cell = min(region)
+    total = 0
+    for i, brick in enumerate(bricks):
+        rest = bricks[:i] + bricks[i + 1 :]
+        # ? Twin orientations cover the same cells and would count a cover twice
+        for blocks in get_shapes(brick.blocks):
+            # ? The first block of `blocks` is its smallest, it must land on `cell`
+            first = next(iter(blocks))
+            pos0 = Position(cell[0] - first[0], cell[1] - first[1])
+            cells = [pos0 + block for block in blocks]
+            if all(pos in region for pos in cells):
+                total += count_cells(rest, region.difference(cells), cap)
+            if total >= cap:
+                break
+        if total >= cap:
+            total = cap
+            break
+
+    count_memo[key] = total
+    return total
+
+
+def count_regions(bricks: list[Brick], regions: list[Region], cap: int) -> int:
+    """Covers of independent regions multiply, over every brick assignment."""
+    if not regions:
+        return 1 if not bricks else 0
+
+    region, rest = regions[0], regions[1:]
+    total = 0
+    for subset in region_subsets(bricks, region, not rest):
+        n = count_region(list(subset), region, cap)
+        if n == 0:
+            continue
+        others = [b for b in bricks if b not in subset]
+        total += n * count_regions(others, rest, cap)
+        if total >= cap:
+            return cap
+    return total
+
+
+def count_cells(bricks: list[Brick], cells: Region, cap: int) -> int:
+    """Count covers of `cells` by exactly `bricks`, region by region."""
+    if not bricks:
+        return 1 if not cells else 0
+    regions = split_region(cells)
+    if len(regions) != 1:
+        return count_regions(bricks, sorted(regions, key=len), cap)
+    if sum(len(b.blocks) for b in bricks) != len(cells):
+        return 0
+    return count_region(bricks, cells, cap)
+
+
+def count_covers(_board: Board, bricks: list[Brick], cap: int) -> int:
+    """
+    Count the distinct covers of the board, up to `cap`.
+    Identical bricks swapping places give the same cover.
+    """
+    init(_board, {}, bricks, False)
+
+    # ? Every cover is found once per ordering of identical bricks
+    shapes = Counter(
+        frozenset(normalize(blocks) for blocks in transform_maps[b.id]) for b in bricks
+    )
+    repeats = prod(factorial(n) for n in shapes.values())
+
+    cells = frozenset(pos for _, pos in pos_set if valid_pos(_board, pos))
+    return count_cells(bricks, cells, cap * repeats) // repeats
+
+
 def solve(
-    _board: Board, bricks: list[Brick], _colormap: dict[int, str]
+    _board: Board,
+    bricks: list[Brick],
+    _colormap: dict[int, str],
+    verbose: bool = True,
+    stats_path: Optional[str] = None,
 ) -> tuple[Board, Records]:
     """
     Return a sequence of positions (x, y), each corresponding to a brick.
+    With `stats_path`, placements are ordered by past solves and the
+    statistics are updated with this one.
     """
 
     board = _board
     records: Records = [(Position(-1, -1), transform.U) for _ in range(len(bricks))]
 
-    init(board, _colormap, bricks)
+    _stats = load_stats(stats_path, fingerprint(bricks)) if stats_path else None
+    init(board, _colormap, bricks, verbose, _stats)
 
-    print(blocks_suffix_sum)
+    if verbose:
+        print(blocks_suffix_sum)
 
-    if solve_recur(board, bricks, 0, records):
+    region = frozenset(pos for _, pos in pos_set)
+    solved = solve_recur(board, bricks, records, region)
+
+    if _stats is not None and stats_path:
+        if solved:
+            _stats.record_solution(records)
+        save_stats(_stats, stats_path)
+
+    if solved:
         assert not any(pos[0] == -1 or pos[1] == -1 for pos, _ in records)
         return board, records
 
     return _board, []
+
+
+def brick_cells(brick: Brick, pos0: Position, t: transform) -> list[Position]:
+    return [pos0 + block for block in get_transform(brick.blocks, t)]
+
+
+def complete(
+    _board: Board,
+    bricks: list[Brick],
+    placed: dict[int, tuple[Position, transform]],
+    _colormap: Optional[dict[int, str]] = None,
+    verbose: bool = False,
+    known: Optional[Iterable[Records]] = None,
+    budget: Optional[float] = HINT_BUDGET,
+) -> tuple[Board, Optional[Records]]:
+    """
+    Continue a partially solved board.
+    `placed` maps brick ids to the user's (position, transform); only the
+    other bricks are searched. Invalid placements raise `InvalidPlacementError`
+    before the board is touched.
+    `known` answers for the date (e.g. from a `SolutionReader`) that agree with
+    `placed` are returned without searching. Otherwise the search stops after
+    `budget` seconds.
+    Return an empty record list if no completion exists, and None if the
+    budget ran out first; the board is then left mid-search.
+    """
+
+    start = time.perf_counter()
+    board = _board
+    records: Records = [(Position(-1, -1), transform.U) for _ in range(len(bricks))]
+
+    # ? Check every placement before anything is put on the board
+    by_id = {b.id: b for b in bricks}
+    wanted: dict[int, frozenset[Position]] = dict()
+    taken: set[Position] = set()
+    for id, (pos0, t) in placed.items():
+        if id not in by_id:
+            raise InvalidPlacementError(f"Unknown brick {id}")
+        cells = brick_cells(by_id[id], pos0, t)
+        if not all(valid_pos(board, pos) for pos in cells):
+            raise InvalidPlacementError(f"Brick {id} cannot be put at {pos0}")
+        if taken.intersection(cells):
+            raise InvalidPlacementError(f"Brick {id} overlaps another placed brick")
+        taken.update(cells)
+        wanted[id] = frozenset(cells)
+
+    init(board, _colormap or {}, bricks, verbose)
+    for id, (pos0, t) in placed.items():
+        take_brick_at(board, id, get_transform(by_id[id].blocks, t), pos0)
+        records[id] = pos0, t
+
+    left = [b for b in bricks if b.id not in placed]
+
+    # ? Compare cells, an orientation may have a twin that covers the same ones
+    for answer in known or []:
+        if all(
+            frozenset(brick_cells(by_id[id], *answer[id])) == cells
+            for id, cells in wanted.items()
+        ):
+            for b in left:
+                pos0, t = answer[b.id]
+                take_brick_at(board, b.id, get_transform(b.blocks, t), pos0)
+                records[b.id] = pos0, t
+            return board, records
+
+    # ? Fail fast when a region left by the user can fit no brick
+    check_fn = get_check_fn(left)
+    region = frozenset(pos for _, pos in pos_set if valid_pos(board, pos))
+    for area in get_regions(board, region):
+        if not check_fn(board, list(area)):
+            return board, []
+
+    global deadline
+    if budget is not None:
+        deadline = start + budget
+    try:
+        solved = solve_recur(board, left, records, region)
+    except _OutOfTime:
+        return board, None
+    finally:
+        deadline = None
+
+    if solved:
+        return board, records
+    return board, []
@@ -0,0 +1,18 @@
+from bricks import Position, transform
+from solution_io import Date
+from solver import Records
+
+# ? A solved 10/19 from `solver.solve`, as (origin, transform) per brick id
+KNOWN_DATE: Date = (10, 19, 1)
+KNOWN_SOLUTION: Records = [
+    (Position(5, 2), transform.D),
+    (Position(2, 3), transform.MD),
+    (Position(3, 3), transform.MR),
+    (Position(7, 5), transform.MU),
+    (Position(2, 6), transform.MD),
+    (Position(0, 0), transform.U),
+    (Position(0, 5), transform.ML),
+    (Position(3, 1), transform.MU),
+    (Position(6, 0), transform.MU),
+    (Position(5, 5), transform.MU),
+]
@@ -0,0 +1,50 @@
+from board import build_board, mark_date
+from bricks import build_bricks
+from iter_solver import Search, enumerate_solutions, load_checkpoint
+from known import KNOWN_DATE, KNOWN_SOLUTION
+
+# ? Leaving these bricks free on top of `KNOWN_SOLUTION` gives 4 solutions
+FREE = (0, 1, 4, 5, 6, 7)
+
+
+def test_unique_cover():
+    # ? Bricks 2 and 6 each have two orientations that are translations of
+    # ? each other; enumerated last they must still give a single cover
+    bricks = build_bricks()
+    last = [bricks[2], bricks[6]]
+    bricks = [b for b in bricks if b not in last] + last
+
+    search = Search(mark_date(build_board(), *KNOWN_DATE), bricks)
+    search.floor = len(bricks) - len(last)
+    search.restore(search.frames_for(KNOWN_SOLUTION, search.floor))
+
+    found = 0
+    while not search.done():
+        if search.step() is not None:
+            found += 1
+    assert found == 1
+
+
+def test_checkpoint_round_trip(tmp_path):
+    placed = {id: r for id, r in enumerate(KNOWN_SOLUTION) if id not in FREE}
+
+    whole = tmp_path / "whole.ndjson"
+    count = enumerate_solutions(
+        *KNOWN_DATE, str(whole), str(tmp_path / "whole.json"), placed=placed
+    )
+    assert count == 4
+
+    # ? Stop every few steps and resume from the checkpoint
+    parts = tmp_path / "parts.ndjson"
+    checkpoint = str(tmp_path / "parts.json")
+    runs = 0
+    state = None
+    while state is None or not state["done"]:
+        resumed = enumerate_solutions(
+            *KNOWN_DATE, str(parts), checkpoint, placed=placed, max_steps=5000
+        )
+        state = load_checkpoint(checkpoint, KNOWN_DATE)
+        runs += 1
+    assert runs > 1
+    assert resumed == count
+    assert parts.read_bytes() == whole.read_bytes()
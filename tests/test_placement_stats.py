@@ -0,0 +1,31 @@
+from bricks import Position, bricks_from_arrays, build_bricks, transform
+from placement_stats import PlacementStats, fingerprint, load_stats, save_stats
+
+POS = Position(1, 2)
+
+
+def test_score_per_visit():
+    stats = PlacementStats()
+    for _ in range(20):
+        stats.record_put(0, transform.U, POS, pruned=False)
+    stats.record_put(0, transform.U, POS, pruned=True)
+    stats.record_put(1, transform.U, POS, pruned=True)
+
+    unseen = stats.score(2, transform.U, POS)
+    assert unseen == 0.5
+    assert stats.score(0, transform.U, POS) > unseen
+    assert stats.score(1, transform.U, POS) < unseen
+
+
+def test_fingerprint_mismatch(tmp_path):
+    path = str(tmp_path / "stats.json")
+    bricks = build_bricks()
+    stats = PlacementStats(fingerprint(bricks))
+    stats.record_solution([(POS, transform.U)])
+    save_stats(stats, path)
+
+    loaded = load_stats(path, fingerprint(bricks))
+    assert loaded.hits == stats.hits and loaded.solves == 1
+
+    other = bricks_from_arrays([[[0, 0], [0, 1]]] * len(bricks))
+    assert not load_stats(path, fingerprint(other))
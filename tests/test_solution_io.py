@@ -0,0 +1,30 @@
+import json
+
+from known import KNOWN_DATE, KNOWN_SOLUTION
+from solution_io import BINARY, NDJSON, SolutionReader, SolutionWriter
+
+
+def test_round_trip(tmp_path):
+    for fmt in (NDJSON, BINARY):
+        path = str(tmp_path / f"solutions.{fmt}")
+        with SolutionWriter(path, len(KNOWN_SOLUTION), fmt) as writer:
+            writer.write(KNOWN_DATE, KNOWN_SOLUTION)
+            writer.write((1, 7, 0), KNOWN_SOLUTION)
+        with SolutionReader(path) as reader:
+            assert len(reader) == 2
+            assert reader.dates() == [KNOWN_DATE, (1, 7, 0)]
+            assert reader[0] == (KNOWN_DATE, KNOWN_SOLUTION)
+
+
+def test_index_reordered_keys(tmp_path):
+    path = tmp_path / "solutions.ndjson"
+    obj = {
+        "records": [
+            [i, t.value, pos[0], pos[1]] for i, (pos, t) in enumerate(KNOWN_SOLUTION)
+        ],
+        "date": list(KNOWN_DATE),
+    }
+    path.write_text(json.dumps(obj) + "\n")
+    with SolutionReader(str(path)) as reader:
+        assert reader.date_at(0) == KNOWN_DATE
+        assert reader.get(KNOWN_DATE) == [KNOWN_SOLUTION]
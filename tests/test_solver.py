@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+import solver
+from board import build_board, mark_date
+from bricks import Position, build_bricks, transform
+from known import KNOWN_DATE, KNOWN_SOLUTION
+from solver import InvalidPlacementError
+from verifier import Verifier
+
+# ? Both solve in seconds with seed 0, and both are Sundays (weekday 0)
+DATES = [(1, 7, 0), (10, 20, 0)]
+
+# ? Lifting these from `KNOWN_SOLUTION` leaves two separate 10 cell regions
+SPLIT = (0, 1, 4, 8)
+
+# ? Lifting these instead leaves 4 ways to put them back
+FREE = (0, 1, 4, 5, 6, 7)
+
+
+@pytest.mark.parametrize("date", DATES)
+def test_solve(date):
+    random.seed(0)
+    bricks = build_bricks()
+    board = mark_date(build_board(), *date)
+    _, records = solver.solve(board, bricks, {}, verbose=False)
+    assert records
+    assert Verifier(bricks).check(date, records) is None
+
+
+def test_split_regions():
+    bricks = build_bricks()
+    board = mark_date(build_board(), *KNOWN_DATE)
+    placed = {id: r for id, r in enumerate(KNOWN_SOLUTION) if id not in SPLIT}
+    _, records = solver.complete(board, bricks, placed, budget=None)
+    verifier = Verifier(bricks)
+    assert verifier.check(KNOWN_DATE, records) is None
+
+    # ? Lift a region of the answer and fill it again from the memo
+    (region, ids), placements = next(
+        (key, value)
+        for key, value in solver.region_memo.items()
+        if value and all(records[b.id] == (pos0, t) for b, pos0, t in value)
+    )
+    solver.lift_records(board, placements)
+    for id in ids:
+        records[id] = Position(-1, -1), transform.U
+    assert solver.solve_region(board, [bricks[id] for id in ids], region, records)
+    assert verifier.check(KNOWN_DATE, records) is None
+
+
+def test_complete_rejects_overlap_untouched():
+    bricks = build_bricks()
+    board = mark_date(build_board(), *KNOWN_DATE)
+    placed = dict(enumerate(KNOWN_SOLUTION))
+    # ? Valid on its own, but on top of brick 0
+    placed[1] = placed[0][0], transform.D
+    with pytest.raises(InvalidPlacementError, match="overlaps"):
+        solver.complete(board, bricks, placed)
+    assert not any(cell.taken for _, _, cell in board)
+
+
+def test_complete_known_and_budget():
+    bricks = build_bricks()
+    known = [KNOWN_SOLUTION]
+    placed = {0: known[0][0]}
+
+    board = mark_date(build_board(), *KNOWN_DATE)
+    _, records = solver.complete(board, bricks, placed, known=known)
+    assert records == known[0]
+
+    # ? One brick down leaves far more search than the budget allows
+    board = mark_date(build_board(), *KNOWN_DATE)
+    _, records = solver.complete(board, bricks, placed, budget=0.01)
+    assert records is None
+
+
+def test_count_covers():
+    bricks = build_bricks()
+    board = mark_date(build_board(), *KNOWN_DATE)
+    assert solver.count_covers(board, bricks, 10) == 10
+
+    cells = frozenset(
+        pos
+        for id in FREE
+        for pos in solver.brick_cells(bricks[id], *KNOWN_SOLUTION[id])
+    )
+    assert solver.count_cells([bricks[id] for id in FREE], cells, 100) == 4
@@ -0,0 +1,143 @@
+import sys
+from typing import Iterable, Optional
+
+from board import VALUE_RANGES, CellType, build_board, mark_date
+from bricks import Brick, Position, build_bricks, get_transform, transform
+from solution_io import Date, SolutionFormatError, SolutionReader
+from solver import Records
+
+# ? Cells are bits of an int, bit i * M + j for cell (i, j)
+Mask = int
+
+# ? (index in the input, date if known, reason)
+Error = tuple[int, Optional[Date], str]
+
+DATE_TYPES = (CellType.MONTH, CellType.DAY, CellType.WEEKDAY)
+
+
+class Verifier:
+    """
+    Check solutions against the board with precomputed bitmasks.
+    Each placement is one cached mask, so a solution costs a few int ops per brick.
+    """
+
+    def __init__(self, bricks: list[Brick]) -> None:
+        self.bricks = bricks
+        board = build_board()
+        self.shape = board.shape()
+        self.playable: Mask = 0
+        for i, j, cell in board:
+            if cell.type != CellType.NONE:
+                self.playable |= self.bit(i, j)
+
+        self._placements: dict[tuple[int, transform, int, int], Mask] = dict()
+        self._goals: dict[Date, Mask] = dict()
+
+    def bit(self, i: int, j: int) -> Mask:
+        return 1 << (i * self.shape[1] + j)
+
+    def placement(self, brick: Brick, pos0: Position, t: transform) -> Mask:
+        """Mask covered by the brick, or 0 if any block misses the playable cells."""
+        key = brick.id, t, pos0[0], pos0[1]
+        if key not in self._placements:
+            N, M = self.shape
+            mask = 0
+            for block in get_transform(brick.blocks, t):
+                pos = pos0 + block
+                if not (0 <= pos[0] < N and 0 <= pos[1] < M):
+                    mask = 0
+                    break
+                mask |= self.bit(pos[0], pos[1])
+            if mask & ~self.playable:
+                mask = 0
+            self._placements[key] = mask
+        return self._placements[key]
+
+    def goal(self, date: Date) -> Mask:
+        if date not in self._goals:
+            mask = 0
+            for i, j, cell in mark_date(build_board(), *date):
+                if cell.goal:
+                    mask |= self.bit(i, j)
+            self._goals[date] = mask
+        return self._goals[date]
+
+    def check(self, date: Date, records: Records) -> Optional[str]:
+        """Return None for an exact cover, else the first problem found."""
+        if len(date) != 3 or any(
+            v not in VALUE_RANGES[ct] for v, ct in zip(date, DATE_TYPES)
+        ):
+            return f"invalid date {date}"
+        if len(records) != len(self.bricks):
+            return f"expected {len(self.bricks)} bricks, got {len(records)}"
+        goal = self.goal(date)
+
+        covered = 0
+        for brick in self.bricks:
+            pos0, t = records[brick.id]
+            if not isinstance(pos0, Position) or not isinstance(t, transform):
+                return f"brick {brick.id} has a malformed placement"
+            mask = self.placement(brick, pos0, t)
+            if not mask:
+                return f"brick {brick.id} is off the board"
+            if mask & covered:
+                return f"brick {brick.id} overlaps"
+            if mask & goal:
+                return f"brick {brick.id} covers the date"
+            covered |= mask
+
+        if covered != self.playable & ~goal:
+            return "cells left uncovered"
+        return None
+
+
+def verify_all(
+    pairs: Iterable[tuple[Date, Records]], bricks: Optional[list[Brick]] = None
+) -> list[Error]:
+    """Return (index, date, reason) for every invalid solution."""
+    verifier = Verifier(bricks if bricks is not None else build_bricks())
+    errors: list[Error] = []
+    for i, (date, records) in enumerate(pairs):
+        reason = verifier.check(date, records)
+        if reason:
+            errors.append((i, date, reason))
+    return errors
+
+
+def verify_file(path: str, bricks: Optional[list[Brick]] = None) -> list[Error]:
+    """
+    Like `verify_all` over a solution file. Entries that cannot be decoded are
+    reported too; a file that cannot be opened at all is one error at index 0.
+    """
+    try:
+        reader = SolutionReader(path)
+    except SolutionFormatError as e:
+        return [(0, None, str(e))]
+
+    verifier = Verifier(bricks if bricks is not None else build_bricks())
+    errors: list[Error] = []
+    with reader:
+        for i in range(len(reader)):
+            try:
+                date, records = reader[i]
+            except SolutionFormatError as e:
+                errors.append((i, reader.date_at(i), str(e)))
+                continue
+            reason = verifier.check(date, records)
+            if reason:
+                errors.append((i, date, reason))
+    return errors
+
+
+def main():
+    failed = False
+    for path in sys.argv[1:]:
+        errors = verify_file(path)
+        for i, date, reason in errors:
+            print(f"{path}:{i} {date}: {reason}")
+        failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()